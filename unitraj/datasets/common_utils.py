@@ -58,6 +58,31 @@ def rotate_points_along_z_tensor(points, angle):
     return points_rot.numpy() if is_numpy else points_rot
 
 
+def rotate_points_along_z_tensor_4d(points, angle):
+    """
+    Rotate 4-D points directly with a broadcasted rotation, avoiding the
+    reshape round-trip needed for rotate_points_along_z_tensor's 3-D
+    contract. Extra feature channels are carried through unchanged (a
+    z-rotation leaves z untouched).
+
+    Args:
+        points: (B, M, T, 2 + C)
+        angle: (B), angle along z-axis, angle increases x ==> y
+    Returns:
+
+    """
+    points, is_numpy = check_numpy_to_torch(points)
+    angle, _ = check_numpy_to_torch(angle)
+
+    cosa = torch.cos(angle)[:, None, None]
+    sina = torch.sin(angle)[:, None, None]
+    x = points[..., 0]
+    y = points[..., 1]
+    points_rot = torch.stack((cosa * x - sina * y, sina * x + cosa * y), dim=-1)
+    points_rot = torch.cat((points_rot, points[..., 2:]), dim=-1)
+    return points_rot.numpy() if is_numpy else points_rot
+
+
 def rotate_points_along_z(points, angle):
     """
     Rotate points around the Z-axis using the given angle.
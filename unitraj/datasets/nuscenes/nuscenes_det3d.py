@@ -226,8 +226,39 @@ class Det3DDataset(BaseDataset):
             'velocity': 'velocities',
         }
         instances = info['instances']
+        if isinstance(instances, dict):
+            # structure-of-arrays layout: one packed array per field
+            # empty gt
+            if len(instances['bbox_3d']) == 0:
+                return None
+            ann_info = dict()
+            for ann_name, temp_anns in instances.items():
+                # map the original dataset label to training label
+                if 'label' in ann_name and ann_name != 'attr_label':
+                    temp_anns = [
+                        self.label_mapping[item]
+                        for item in temp_anns.tolist()
+                    ]
+                if ann_name in name_mapping:
+                    mapped_ann_name = name_mapping[ann_name]
+                else:
+                    mapped_ann_name = ann_name
+
+                if 'label' in ann_name:
+                    temp_anns = np.array(temp_anns).astype(np.int64)
+                elif ann_name in name_mapping:
+                    temp_anns = np.asarray(temp_anns).astype(np.float32)
+                else:
+                    temp_anns = np.asarray(temp_anns)
+
+                ann_info[mapped_ann_name] = temp_anns
+            ann_info['instances'] = info['instances']
+
+            for label in ann_info['gt_labels_3d']:
+                if label != -1:
+                    self.num_ins_per_cat[label] += 1
         # empty gt
-        if len(instances) == 0:
+        elif len(instances) == 0:
             return None
         else:
             keys = list(instances[0].keys())
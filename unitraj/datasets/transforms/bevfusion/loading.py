@@ -13,7 +13,8 @@ from mmdet3d.registry import TRANSFORMS
 from nuscenes.map_expansion.map_api import NuScenesMap
 from nuscenes.map_expansion.map_api import locations as LOCATIONS
 from mmcv.transforms.base import BaseTransform
-from .loading_utils import load_augmented_point_cloud, reduce_LiDAR_beams
+from .loading_utils import (load_augmented_point_cloud, reduce_LiDAR_beams,
+                            restore_transform_matrix)
 from .av2_map_api import ArgoMapExplorer
 from mmdet3d.structures.points import get_points_type, BasePoints
 from PIL import Image
@@ -146,10 +147,8 @@ class BEVLoadMultiViewImageFromFiles(LoadMultiViewImageFromFiles):
                 assert idx == 0
                 rfc_exist = True
             filename.append(cam_item['img_path'])
-            lidar2cam.append(cam_item['lidar2cam'])
-
-            lidar2cam_array = np.array(cam_item['lidar2cam']).astype(
-                np.float32)
+            lidar2cam_array = restore_transform_matrix(cam_item['lidar2cam'])
+            lidar2cam.append(lidar2cam_array)
             lidar2cam_rot = lidar2cam_array[:3, :3]
             lidar2cam_trans = lidar2cam_array[:3, 3:4]
             camera2lidar = np.eye(4)
@@ -571,8 +570,9 @@ class LoadBEVSegmentation(BaseTransform):
         else:
             lidar2point = torch.eye(4).cpu().numpy()
         point2lidar = np.linalg.inv(lidar2point)
-        lidar2ego = np.array(ori_data["lidar_points"]["lidar2ego"])
-        ego2global = np.array(ori_data["ego2global"])
+        lidar2ego = restore_transform_matrix(
+            ori_data["lidar_points"]["lidar2ego"])
+        ego2global = restore_transform_matrix(ori_data["ego2global"])
         lidar2global = ego2global @ lidar2ego @ point2lidar
 
         map_pose = lidar2global[:2, 3]
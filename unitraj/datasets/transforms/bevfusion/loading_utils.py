@@ -4,6 +4,20 @@ import numpy as np
 import torch
 
 
+def restore_transform_matrix(mat):
+    """Restore a transform matrix from its compact storage form.
+
+    Info pkls store transforms as float16 and keep only the top (3, 4) rows
+    of rigid transforms; this pads the constant [0, 0, 0, 1] row back and
+    returns a full float32 matrix.
+    """
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.shape == (3, 4):
+        mat = np.concatenate(
+            [mat, np.array([[0., 0., 0., 1.]], dtype=np.float32)], axis=0)
+    return mat
+
+
 def load_augmented_point_cloud(path, virtual=False, reduce_beams=32):
     # NOTE: following Tianwei's implementation, it is hard coded for nuScenes
     points = np.fromfile(path, dtype=np.float32).reshape(-1, 5)
@@ -14,6 +14,8 @@ from mmdet3d.structures.bbox_3d import get_box_type
 from mmdet3d.structures.points import BasePoints, get_points_type
 import pyarrow.feather as feather
 
+from .bevfusion.loading_utils import restore_transform_matrix
+
 
 class LoadMultiViewImageFromFiles(BaseTransform):
     """Load multi channel images from a list of separate channel files.
@@ -153,8 +155,8 @@ class LoadMultiViewImageFromFiles(BaseTransform):
         filename, cam2img, lidar2cam = [], [], []
         for _, cam_item in results['images'].items():
             filename.append(cam_item['img_path'])
-            cam2img.append(cam_item['cam2img'])
-            lidar2cam.append(cam_item['lidar2cam'])
+            cam2img.append(restore_transform_matrix(cam_item['cam2img']))
+            lidar2cam.append(restore_transform_matrix(cam_item['lidar2cam']))
         results['filename'] = filename
         results['cam2img'] = cam2img
         results['lidar2cam'] = lidar2cam
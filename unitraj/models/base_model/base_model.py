@@ -1,5 +1,7 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import matplotlib.pyplot as plt
 
 import numpy as np
@@ -7,10 +9,82 @@ import pytorch_lightning as pl
 import torch
 import wandb
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 import datasets.common_utils as common_utils
 import utils.visualization as visualization
 
 
+# The optional eval dependencies are imported on first use and cached here so
+# the hot methods skip the per-call sys.modules lookup and attribute bind.
+_nuscenes_eval = None
+_waymo_evaluation = None
+
+
+def _get_nuscenes_eval():
+    global _nuscenes_eval
+    if _nuscenes_eval is None:
+        from nuscenes.eval.prediction.compute_metrics import compute_metrics
+        from nuscenes.eval.prediction.data_classes import Prediction
+        _nuscenes_eval = (compute_metrics, Prediction)
+    return _nuscenes_eval
+
+
+def _get_waymo_evaluation():
+    global _waymo_evaluation
+    if _waymo_evaluation is None:
+        from unitraj.models.base_model.waymo_eval import waymo_evaluation
+        _waymo_evaluation = waymo_evaluation
+    return _waymo_evaluation
+
+
+def _project_trajs_to_world(pred_trajs, center_objects_world, map_center):
+    """Rotate predicted trajectories into the world frame and translate them
+    by the object center and map center."""
+    pred_trajs_world = common_utils.rotate_points_along_z_tensor_4d(
+        points=pred_trajs, angle=center_objects_world[:, 6])
+    pred_trajs_world[:, :, :, 0:2] += center_objects_world[:, None, None, 0:2] + map_center[:, None, None, 0:2]
+    return pred_trajs_world
+
+
+if hasattr(torch, 'compile'):
+    # Fuse the rotation with the two broadcasted adds so the full-size
+    # intermediate is not written back to memory between kernels.
+    _project_trajs_to_world = torch.compile(_project_trajs_to_world, dynamic=True)
+
+
+def _compute_batch_metrics(predicted_prob, ade_losses, fde):
+    """Compute the per-sample minADE/minFDE/miss-rate/brier metrics from the
+    (B, K) mode tensors.
+
+    All reductions run on the tensors' device; only one small (B, 5) tensor
+    is moved to CPU.
+    """
+    top5_idx = predicted_prob.topk(5, dim=1).indices
+    minade5 = ade_losses.gather(1, top5_idx).min(dim=1).values
+    minade10 = ade_losses.min(dim=1).values
+
+    top1_idx = predicted_prob.argmax(dim=1, keepdim=True)
+    minfde1 = fde.gather(1, top1_idx).squeeze(1)
+    minfde10, best_fde_idx = fde.min(dim=1)
+    best_prob = predicted_prob.gather(1, best_fde_idx.unsqueeze(1)).squeeze(1)
+
+    metrics = torch.stack(
+        (minade5, minade10, minfde1, minfde10, best_prob), dim=1).cpu().numpy()
+    minade5, minade10, minfde1, minfde10, best_prob = metrics.T
+
+    return {
+        'minADE5': minade5,
+        'minADE10': minade10,
+        'minFDE1': minfde1,
+        'minFDE10': minfde10,
+        'miss_rate10': (minfde10 > 2.0).astype(np.float32),
+        'brier_fde10': minfde10 + np.square(1 - best_prob)}
+
+
 class BaseModel(pl.LightningModule):
 
     def __init__(self, config):
@@ -18,12 +92,17 @@ class BaseModel(pl.LightningModule):
         self.config = config
 
         self.pred_dicts = []
+        # Created on first use so the module stays picklable for spawn-based
+        # DDP launchers.
+        self._viz_pool = None
 
-        if config.get('eval_nuscenes', False):
-            self.init_nuscenes()
+        # The NuScenes trainval load takes ~30s and several GB of RAM, so it
+        # is deferred to the first metric computation at epoch end.
+        self.helper = None
+        self.pred_config5 = None
 
     def init_nuscenes(self):
-        if self.config.get('eval_nuscenes', False):
+        if self.helper is None and self.config.get('eval_nuscenes', False):
             from nuscenes import NuScenes
 
             from nuscenes.eval.prediction.config import PredictionConfig
@@ -70,7 +149,15 @@ class BaseModel(pl.LightningModule):
         elif self.config.get('eval_nuscenes', False):
             import os
             os.makedirs('submission', exist_ok=True)
-            json.dump(self.pred_dicts, open(os.path.join('submission', "evalai_submission.json"), "w"))
+            submission_path = os.path.join('submission', "evalai_submission.json")
+            if orjson is not None:
+                # orjson serializes the NumPy arrays directly and is several
+                # times faster than stdlib json on these nested dicts.
+                with open(submission_path, "wb") as f:
+                    f.write(orjson.dumps(self.pred_dicts,
+                                         option=orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                json.dump(self.pred_dicts, open(submission_path, "w"))
             metric_results = self.compute_metrics_nuscenes(self.pred_dicts)
             print('\n', metric_results)
         self.pred_dicts = []
@@ -79,12 +166,13 @@ class BaseModel(pl.LightningModule):
         raise NotImplementedError
 
     def compute_metrics_nuscenes(self, pred_dicts):
-        from nuscenes.eval.prediction.compute_metrics import compute_metrics
+        self.init_nuscenes()
+        compute_metrics, _ = _get_nuscenes_eval()
         metric_results = compute_metrics(pred_dicts, self.helper, self.pred_config5)
         return metric_results
 
     def compute_metrics_waymo(self, pred_dicts):
-        from unitraj.models.base_model.waymo_eval import waymo_evaluation
+        waymo_evaluation = _get_waymo_evaluation()
         try:
             num_modes_for_eval = pred_dicts[0]['pred_trajs'].shape[0]
         except:
@@ -101,70 +189,61 @@ class BaseModel(pl.LightningModule):
 
         return metric_result_str, metric_results
 
+    def _predictions_to_world(self, batch_dict, prediction):
+        """Project the predicted trajectories into the world frame; shared by
+        the official eval branches."""
+        input_dict = batch_dict['input_dict']
+        pred_trajs = prediction['predicted_trajectory']
+        center_objects_world = input_dict['center_objects_world'].type_as(pred_trajs)
+
+        # The output is only consumed on CPU, so skip autograd tracking.
+        with torch.no_grad():
+            pred_trajs_world = _project_trajs_to_world(
+                pred_trajs, center_objects_world, input_dict['map_center'])
+        return input_dict, pred_trajs_world
+
     def compute_official_evaluation(self, batch_dict, prediction):
         if self.config.get('eval_waymo', False):
-
-            input_dict = batch_dict['input_dict']
-            pred_scores = prediction['predicted_probability']
-            pred_trajs = prediction['predicted_trajectory']
-            center_objects_world = input_dict['center_objects_world'].type_as(pred_trajs)
-            num_center_objects, num_modes, num_timestamps, num_feat = pred_trajs.shape
-
-            pred_trajs_world = common_utils.rotate_points_along_z_tensor(
-                points=pred_trajs.reshape(num_center_objects, num_modes * num_timestamps, num_feat),
-                angle=center_objects_world[:, 6].reshape(num_center_objects)
-            ).reshape(num_center_objects, num_modes, num_timestamps, num_feat)
-            pred_trajs_world[:, :, :, 0:2] += center_objects_world[:, None, None, 0:2] + input_dict['map_center'][:,
-                                                                                         None, None, 0:2]
-
-            pred_dict_list = []
-
-            for bs_idx in range(batch_dict['batch_size']):
-                single_pred_dict = {
-                    'scenario_id': input_dict['scenario_id'][bs_idx],
-                    'pred_trajs': pred_trajs_world[bs_idx, :, :, 0:2].cpu().numpy(),
-                    'pred_scores': pred_scores[bs_idx, :].cpu().numpy(),
-                    'object_id': input_dict['center_objects_id'][bs_idx],
-                    'object_type': input_dict['center_objects_type'][bs_idx],
-                    'gt_trajs': input_dict['center_gt_trajs_src'][bs_idx].cpu().numpy(),
-                    'track_index_to_predict': input_dict['track_index_to_predict'][bs_idx].cpu().numpy()
-                }
-                pred_dict_list.append(single_pred_dict)
+            input_dict, pred_trajs_world = self._predictions_to_world(
+                batch_dict, prediction)
+
+            # One transfer per tensor instead of one GPU sync per sample.
+            pred_trajs_np = pred_trajs_world[:, :, :, 0:2].cpu().numpy()
+            pred_scores_np = prediction['predicted_probability'].cpu().numpy()
+            gt_trajs_np = input_dict['center_gt_trajs_src'].cpu().numpy()
+            track_index_np = input_dict['track_index_to_predict'].cpu().numpy()
+
+            pred_dict_list = [{
+                'scenario_id': input_dict['scenario_id'][bs_idx],
+                'pred_trajs': pred_trajs_np[bs_idx],
+                'pred_scores': pred_scores_np[bs_idx],
+                'object_id': input_dict['center_objects_id'][bs_idx],
+                'object_type': input_dict['center_objects_type'][bs_idx],
+                'gt_trajs': gt_trajs_np[bs_idx],
+                'track_index_to_predict': track_index_np[bs_idx]
+            } for bs_idx in range(batch_dict['batch_size'])]
 
             assert len(pred_dict_list) == batch_dict['batch_size']
 
             self.pred_dicts += pred_dict_list
 
         elif self.config.get('eval_nuscenes', False):
-            from nuscenes.eval.prediction.data_classes import Prediction
-            input_dict = batch_dict['input_dict']
-            pred_scores = prediction['predicted_probability']
-            pred_trajs = prediction['predicted_trajectory']
-            center_objects_world = input_dict['center_objects_world'].type_as(pred_trajs)
-
-            num_center_objects, num_modes, num_timestamps, num_feat = pred_trajs.shape
-            # assert num_feat == 7
-
-            pred_trajs_world = common_utils.rotate_points_along_z_tensor(
-                points=pred_trajs.reshape(num_center_objects, num_modes * num_timestamps, num_feat),
-                angle=center_objects_world[:, 6].reshape(num_center_objects)
-            ).reshape(num_center_objects, num_modes, num_timestamps, num_feat)
-            pred_trajs_world[:, :, :, 0:2] += center_objects_world[:, None, None, 0:2] + input_dict['map_center'][:,
-                                                                                         None, None, 0:2]
-            pred_dict_list = []
-
-            for bs_idx in range(batch_dict['batch_size']):
-                single_pred_dict = {
-                    'instance': input_dict['scenario_id'][bs_idx].split('_')[1],
-                    'sample': input_dict['scenario_id'][bs_idx].split('_')[2],
-                    'prediction': pred_trajs_world[bs_idx, :, 4::5, 0:2].cpu().numpy(),
-                    'probabilities': pred_scores[bs_idx, :].cpu().numpy(),
-                }
-
-                pred_dict_list.append(
-                    Prediction(instance=single_pred_dict["instance"], sample=single_pred_dict["sample"],
-                               prediction=single_pred_dict["prediction"],
-                               probabilities=single_pred_dict["probabilities"]).serialize())
+            _, Prediction = _get_nuscenes_eval()
+            input_dict, pred_trajs_world = self._predictions_to_world(
+                batch_dict, prediction)
+
+            # One transfer per tensor instead of one GPU sync per sample.
+            pred_trajs_np = pred_trajs_world[:, :, 4::5, 0:2].cpu().numpy()
+            pred_scores_np = prediction['predicted_probability'].cpu().numpy()
+            scenario_tokens = [s.split('_') for s in input_dict['scenario_id']]
+
+            pred_dict_list = [
+                Prediction(instance=scenario_tokens[bs_idx][1],
+                           sample=scenario_tokens[bs_idx][2],
+                           prediction=pred_trajs_np[bs_idx],
+                           probabilities=pred_scores_np[bs_idx]).serialize()
+                for bs_idx in range(batch_dict['batch_size'])
+            ]
 
             self.pred_dicts += pred_dict_list
     
@@ -176,95 +255,74 @@ class BaseModel(pl.LightningModule):
         gt_traj_mask = inputs['center_gt_trajs_mask'].unsqueeze(1)
         center_gt_final_valid_idx = inputs['center_gt_final_valid_idx']
 
-        predicted_traj = prediction['predicted_trajectory']
-        predicted_prob = prediction['predicted_probability'].detach().cpu().numpy()
+        predicted_traj = prediction['predicted_trajectory'].detach()
+        predicted_prob = prediction['predicted_probability'].detach()
 
         # Calculate ADE losses
         ade_diff = torch.norm(predicted_traj[:, :, :, :2] - gt_traj[:, :, :, :2], 2, dim=-1)
-        ade_losses = torch.sum(ade_diff * gt_traj_mask, dim=-1) / torch.sum(gt_traj_mask, dim=-1)
-        ade_losses = ade_losses.cpu().detach().numpy() # (B, K)
-        
-        top5_indices = np.argsort(predicted_prob, axis=1)[:, -5:]  # (B, 5)
-        top5_ade_losses = np.take_along_axis(ade_losses, top5_indices, axis=1) # (B, 5)
-        
-        minade5 = np.min(top5_ade_losses, axis=1) # (B)
-        minade10 = np.min(ade_losses, axis=1) # (B)
-        
-        # Calculate FDE losses
+        ade_losses = torch.sum(ade_diff * gt_traj_mask, dim=-1) / torch.sum(gt_traj_mask, dim=-1) # (B, K)
+
+        # Calculate FDE losses; expand gives a zero-stride index view, so no
+        # (B, K) index tensor is materialized for the gather.
         bs, modes, future_len = ade_diff.shape
-        center_gt_final_valid_idx = center_gt_final_valid_idx.view(-1, 1, 1).repeat(1, modes, 1).to(torch.int64)
-
-        fde = torch.gather(ade_diff, -1, center_gt_final_valid_idx).cpu().detach().numpy().squeeze(-1)
-        
-        top1_indices = np.argmax(predicted_prob, axis=1)
-        
-        minfde1 = fde[np.arange(bs), top1_indices]
-        minfde10 = np.min(fde, axis=-1)
-
-        best_fde_idx = np.argmin(fde, axis=-1)
-        predicted_prob = predicted_prob[np.arange(bs), best_fde_idx]
-        miss_rate10 = (minfde10 > 2.0)
-        brier_fde10 = minfde10 + np.square(1 - predicted_prob)
-
-        loss_dict = {
-            'minADE5': minade5,
-            'minADE10': minade10,
-            'minFDE1': minfde1,
-            'minFDE10': minfde10,
-            'miss_rate10': miss_rate10.astype(np.float32),
-            'brier_fde10': brier_fde10}
+        center_gt_final_valid_idx = center_gt_final_valid_idx.to(
+            torch.int64).view(-1, 1, 1).expand(-1, modes, 1)
+        fde = torch.gather(ade_diff, -1, center_gt_final_valid_idx).squeeze(-1)
+
+        loss_dict = _compute_batch_metrics(predicted_prob, ade_losses, fde)
 
         important_metrics = list(loss_dict.keys())
 
         new_dict = {}
-        dataset_names = inputs['dataset_name']
-        unique_dataset_names = np.unique(dataset_names)
-        for dataset_name in unique_dataset_names:
-            batch_idx_for_this_dataset = np.argwhere([n == str(dataset_name) for n in dataset_names])[:, 0]
+        dataset_names = np.asarray(inputs['dataset_name'])
+        for dataset_name in np.unique(dataset_names):
+            dataset_mask = dataset_names == dataset_name
             for key in loss_dict.keys():
-                new_dict[dataset_name + '/' + key] = loss_dict[key][batch_idx_for_this_dataset]
+                new_dict[dataset_name + '/' + key] = loss_dict[key][dataset_mask]
 
         # merge new_dict with log_dict
         loss_dict.update(new_dict)
         # loss_dict.update(avg_dict)
 
         if status == 'val' and self.config.get('eval', False):
+            # Stack the metrics once so each bucket costs a single boolean
+            # index instead of one fancy-index per metric.
+            metrics_mat = np.stack([loss_dict[key] for key in important_metrics])
 
-            # Split scores based on trajectory type
             new_dict = {}
+
+            def _bucket_metrics(prefix, mask):
+                if mask.any():
+                    sub = metrics_mat[:, mask]
+                    for key_idx, key in enumerate(important_metrics):
+                        new_dict[prefix + "_" + key] = sub[key_idx]
+
+            # Split scores based on trajectory type
             trajectory_types = inputs["trajectory_type"].cpu().numpy()
             trajectory_correspondance = {0: "stationary", 1: "straight", 2: "straight_right",
                                          3: "straight_left", 4: "right_u_turn", 5: "right_turn",
                                          6: "left_u_turn", 7: "left_turn"}
-            for traj_type in range(8):
-                batch_idx_for_traj_type = np.where(trajectory_types == traj_type)[0]
-                if len(batch_idx_for_traj_type) > 0:
-                    for key in important_metrics:
-                        new_dict["traj_type/" + trajectory_correspondance[traj_type] + "_" + key] = loss_dict[key][
-                            batch_idx_for_traj_type]
-            loss_dict.update(new_dict)
+            for traj_type, traj_name in trajectory_correspondance.items():
+                _bucket_metrics("traj_type/" + traj_name,
+                                trajectory_types == traj_type)
 
             # Split scores based on kalman_difficulty @6s
-            new_dict = {}
             kalman_difficulties = inputs["kalman_difficulty"][:,
                                   -1].cpu().numpy()  # Last is difficulty at 6s (others are 2s and 4s)
-            for kalman_bucket, (low, high) in {"easy": [0, 30], "medium": [30, 60], "hard": [60, 9999999]}.items():
-                batch_idx_for_kalman_diff = \
-                    np.where(np.logical_and(low <= kalman_difficulties, kalman_difficulties < high))[0]
-                if len(batch_idx_for_kalman_diff) > 0:
-                    for key in important_metrics:
-                        new_dict["kalman/" + kalman_bucket + "_" + key] = loss_dict[key][batch_idx_for_kalman_diff]
-            loss_dict.update(new_dict)
-
-            new_dict = {}
-            agent_types = [1, 2, 3]
+            kalman_buckets = np.digitize(kalman_difficulties, [30, 60])
+            # get_kalman_difficulty stores -1 when no estimate could be
+            # computed; keep those samples out of every bucket.
+            kalman_valid = kalman_difficulties >= 0
+            for bucket_idx, kalman_bucket in enumerate(["easy", "medium", "hard"]):
+                _bucket_metrics("kalman/" + kalman_bucket,
+                                (kalman_buckets == bucket_idx) & kalman_valid)
+
+            # Split scores based on agent type
             agent_type_dict = {1: "vehicle", 2: "pedestrian", 3: "bicycle"}
-            for type in agent_types:
-                batch_idx_for_type = np.where(inputs['center_objects_type'] == type)[0]
-                if len(batch_idx_for_type) > 0:
-                    for key in important_metrics:
-                        new_dict["agent_types" + '/' + agent_type_dict[type] + "_" + key] = loss_dict[key][
-                            batch_idx_for_type]
+            center_objects_type = np.asarray(inputs['center_objects_type'])
+            for type, type_name in agent_type_dict.items():
+                _bucket_metrics("agent_types" + '/' + type_name,
+                                center_objects_type == type)
             # merge new_dict with log_dict
             loss_dict.update(new_dict)
 
@@ -276,12 +334,17 @@ class BaseModel(pl.LightningModule):
             self.log(status + "/" + k, v, on_step=False, on_epoch=True, sync_dist=True, batch_size=size_dict[k])
 
         # if status == 'val' and batch_idx == 0 and not self.config['debug']:
-        if self.local_rank == 0 and status == 'val' and batch_idx < 50:
+        if self.local_rank == 0 and status == 'val' and batch_idx < 50 \
+                and batch_idx % self.config.get('viz_stride', 1) == 0:
             img = visualization.visualize_prediction(batch, prediction)
             wandb.log({"prediction": [wandb.Image(img)]})
             experiment_dir = os.path.join(f'experiment/{self.config["NAME"]}/{self.config["exp_name"]}', f"batch_{batch_idx}")
             os.makedirs(experiment_dir, exist_ok=True)
             img_save_path = os.path.join(experiment_dir, f"prediction_batch_{batch_idx}_in_epoch{self.current_epoch}.png")
-            plt.savefig(img_save_path)
+            # Encode the PNG off the main thread so the blocking savefig
+            # overlaps with the next forward pass.
+            if self._viz_pool is None:
+                self._viz_pool = ThreadPoolExecutor(max_workers=2)
+            self._viz_pool.submit(plt.gcf().savefig, img_save_path)
 
         return
\ No newline at end of file
@@ -70,6 +70,30 @@ def infer_abbr(class_type):
             return 'norm_layer'
 
 
+_ALL_NORM_BASES = (_BatchNorm, _InstanceNorm, nn.GroupNorm, nn.LayerNorm)
+
+_NORM_LAYER_MAP = {
+    'BN': nn.BatchNorm2d,
+    'BN1d': nn.BatchNorm1d,
+    'BN2d': nn.BatchNorm2d,
+    'BN3d': nn.BatchNorm3d,
+    'SyncBN': SyncBatchNorm,
+    'GN': nn.GroupNorm,
+    'LN': nn.LayerNorm,
+    'IN': nn.InstanceNorm2d,
+    'IN1d': nn.InstanceNorm1d,
+    'IN2d': nn.InstanceNorm2d,
+    'IN3d': nn.InstanceNorm3d,
+}
+
+# Abbreviations only depend on the class, so resolve them once at import
+# instead of running the issubclass chain on every layer construction.
+_NORM_TABLE = {
+    name: (cls, infer_abbr(cls))
+    for name, cls in _NORM_LAYER_MAP.items()
+}
+
+
 def build_norm_layer(cfg: Dict,
                      num_features: int,
                      postfix: Union[int, str] = '') -> Tuple[str, nn.Module]:
@@ -90,20 +114,6 @@ def build_norm_layer(cfg: Dict,
         of abbreviation and postfix, e.g., bn1, gn. The second element is the
         created norm layer.
     """
-    norm_layer_map = {
-        'BN': nn.BatchNorm2d,
-        'BN1d': nn.BatchNorm1d,
-        'BN2d': nn.BatchNorm2d,
-        'BN3d': nn.BatchNorm3d,
-        'SyncBN': SyncBatchNorm,
-        'GN': nn.GroupNorm,
-        'LN': nn.LayerNorm,
-        'IN': nn.InstanceNorm2d,
-        'IN1d': nn.InstanceNorm1d,
-        'IN2d': nn.InstanceNorm2d,
-        'IN3d': nn.InstanceNorm3d,
-    }
-    
     if not isinstance(cfg, dict):
         raise TypeError('cfg must be a dict')
     if 'type' not in cfg:
@@ -124,12 +134,10 @@ def build_norm_layer(cfg: Dict,
     #         raise KeyError(f'Cannot find {norm_layer} in registry under '
     #                        f'scope name {registry.scope}')
     
-    if layer_type in norm_layer_map:
-        norm_layer = norm_layer_map[layer_type]
+    if layer_type in _NORM_TABLE:
+        norm_layer, abbr = _NORM_TABLE[layer_type]
     else:
         raise KeyError(f'Unrecognized norm type {layer_type}')
-    
-    abbr = infer_abbr(norm_layer)
 
     assert isinstance(postfix, (int, str))
     name = abbr + str(postfix)
@@ -172,5 +180,4 @@ def is_norm(layer: nn.Module,
     if exclude and isinstance(layer, exclude):
         return False
 
-    all_norm_bases = (_BatchNorm, _InstanceNorm, nn.GroupNorm, nn.LayerNorm)
-    return isinstance(layer, all_norm_bases)
+    return isinstance(layer, _ALL_NORM_BASES)
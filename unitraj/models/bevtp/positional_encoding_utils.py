@@ -1,6 +1,34 @@
 import math
 import torch
 
+# dim_t only depends on (hidden_dim, temperature, device), all fixed per call
+# site, so build it once instead of running arange/div/pow every forward.
+_DIM_T_CACHE = {}
+
+def _get_dim_t(half_hidden_dim, temperature, device):
+    key = (half_hidden_dim, temperature, device)
+    dim_t = _DIM_T_CACHE.get(key)
+    if dim_t is None:
+        dim_t = torch.arange(half_hidden_dim, dtype=torch.float32, device=device)
+        dim_t = temperature ** (2 * torch.div(dim_t, 2, rounding_mode='trunc') / half_hidden_dim)
+        _DIM_T_CACHE[key] = dim_t
+    return dim_t
+
+def _interleave_sincos(pos, out=None):
+    # Equivalent to torch.stack((pos[..., 0::2].sin(), pos[..., 1::2].cos()),
+    # dim=-1).flatten(-2) but writes strided slices of one preallocated
+    # output instead of materializing the stacked temporary.
+    if out is None:
+        out = torch.empty_like(pos)
+    # sin and cos share the argument reduction, so evaluating both over the
+    # contiguous tensor lets the compiler emit a single fused sincos pass
+    # instead of two kernels over strided slices.
+    sin = pos.sin()
+    cos = pos.cos()
+    out[..., 0::2] = sin[..., 0::2]
+    out[..., 1::2] = cos[..., 1::2]
+    return out
+
 def gen_sineembed_for_position(pos_tensor, hidden_dim=256, temperature=10000):
     pos_tensor_dim_4 = False
     if pos_tensor.dim() == 4:
@@ -8,30 +36,32 @@ def gen_sineembed_for_position(pos_tensor, hidden_dim=256, temperature=10000):
         pos_tensor = pos_tensor.reshape(B, K*N, -1)
         pos_tensor_dim_4 = True
         
+    num_components = pos_tensor.size(-1)
+    if num_components not in (2, 4):
+        raise ValueError("Unknown pos_tensor shape(-1):{}".format(num_components))
+
     half_hidden_dim = hidden_dim // 2
     scale = 2 * math.pi
-    dim_t = torch.arange(half_hidden_dim, dtype=torch.float32, device=pos_tensor.device)
-    dim_t = temperature ** (2 * torch.div(dim_t, 2, rounding_mode='trunc') / half_hidden_dim)
-    x_embed = pos_tensor[:, :, 0] * scale
-    y_embed = pos_tensor[:, :, 1] * scale
-    pos_x = x_embed[:, :, None] / dim_t
-    pos_y = y_embed[:, :, None] / dim_t
-    pos_x = torch.stack((pos_x[:, :, 0::2].sin(), pos_x[:, :, 1::2].cos()), dim=3).flatten(2)
-    pos_y = torch.stack((pos_y[:, :, 0::2].sin(), pos_y[:, :, 1::2].cos()), dim=3).flatten(2)
-    if pos_tensor.size(-1) == 2:
-        pos = torch.cat((pos_y, pos_x), dim=2)
-    elif pos_tensor.size(-1) == 4:
-        w_embed = pos_tensor[:, :, 2] * scale
-        pos_w = w_embed[:, :, None] / dim_t
-        pos_w = torch.stack((pos_w[:, :, 0::2].sin(), pos_w[:, :, 1::2].cos()), dim=3).flatten(2)
-
-        h_embed = pos_tensor[:, :, 3] * scale
-        pos_h = h_embed[:, :, None] / dim_t
-        pos_h = torch.stack((pos_h[:, :, 0::2].sin(), pos_h[:, :, 1::2].cos()), dim=3).flatten(2)
-
-        pos = torch.cat((pos_y, pos_x, pos_w, pos_h), dim=2)
-    else:
-        raise ValueError("Unknown pos_tensor shape(-1):{}".format(pos_tensor.size(-1)))
+    dim_t = _get_dim_t(half_hidden_dim, temperature, pos_tensor.device)
+    # Write each component's sin/cos block straight into its slice of a
+    # preallocated output instead of materializing the blocks for torch.cat.
+    # Component order matches the original cat: y, x(, w, h).
+    pos = pos_tensor.new_empty(pos_tensor.size(0), pos_tensor.size(1),
+                               half_hidden_dim * num_components)
+    for comp_idx, src_idx in enumerate((1, 0, 2, 3)[:num_components]):
+        embed = (pos_tensor[:, :, src_idx] * scale)[:, :, None] / dim_t
+        _interleave_sincos(
+            embed,
+            out=pos[:, :, comp_idx * half_hidden_dim:
+                    (comp_idx + 1) * half_hidden_dim])
     if pos_tensor_dim_4:
         pos = pos.view(B, K, N, -1)
-    return pos
\ No newline at end of file
+    return pos
+
+
+if hasattr(torch, 'compile'):
+    # The embedding is a long chain of memory-bound elementwise ops; let
+    # the compiler fuse them into a single kernel instead of launching one
+    # per op. dynamic=True shares the compiled graph across query counts.
+    gen_sineembed_for_position = torch.compile(
+        gen_sineembed_for_position, dynamic=True)
\ No newline at end of file